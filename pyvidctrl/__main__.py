@@ -3,10 +3,11 @@
 from v4l2 import *
 from fcntl import ioctl
 
-from itertools import chain
+import os
 import signal
 import sys
 import json
+import time
 import argparse
 import errno
 
@@ -72,6 +73,33 @@ def query_tegra_ctrls(dev):
     """This function supports deprecated TEGRA_CAMERA_CID_* API"""
     ctrls = []
 
+    # let the driver hand out existing controls in the Tegra range
+    # instead of probing every single id between BASE and LASTP1
+    ctrlid = TEGRA_CAMERA_CID_BASE - 1
+    supports_next = False
+
+    while True:
+        ctrl = v4l2_queryctrl()
+        ctrl.id = ctrlid | V4L2_CTRL_FLAG_NEXT_CTRL
+        try:
+            ioctl(dev, VIDIOC_QUERYCTRL, ctrl)
+        except OSError:
+            # no more controls, or NEXT_CTRL is unsupported
+            break
+
+        supports_next = True
+        if ctrl.id >= TEGRA_CAMERA_CID_LASTP1:
+            break
+
+        if not ctrl.flags & V4L2_CTRL_FLAG_DISABLED:
+            ctrls.append(ctrl)
+
+        ctrlid = ctrl.id
+
+    if supports_next:
+        return {"Tegra Controls": ctrls}
+
+    # old Tegra kernels predate NEXT_CTRL; fall back to the linear scan
     ctrlid = TEGRA_CAMERA_CID_BASE
 
     ctrl = v4l2_queryctrl()
@@ -102,28 +130,137 @@ def query_ctrls(dev):
     ctrls_v4l2 = query_v4l2_ctrls(dev)
     ctrls_tegra = query_tegra_ctrls(dev)
 
+    # some drivers expose Tegra CIDs through the standard walk too;
+    # drop duplicates so no control gets two widgets (and two ioctls
+    # per frame)
+    seen = {c.id for ctrls in ctrls_v4l2.values() for c in ctrls}
+    for name, ctrls in ctrls_tegra.items():
+        ctrls_tegra[name] = [c for c in ctrls if c.id not in seen]
+
     return {**ctrls_v4l2, **ctrls_tegra}
 
 
-def query_driver(dev):
+def query_capability(dev):
     try:
         cp = v4l2_capability()
         ioctl(dev, VIDIOC_QUERYCAP, cp)
-        return cp.driver
+        return cp
+    except Exception:
+        return None
+
+
+def query_driver(dev):
+    cp = query_capability(dev)
+    return cp.driver if cp is not None else b"unknown"
+
+
+def ctrls_schema_fname(cp):
+    # the driver name alone is ambiguous (two UVC cameras both report
+    # 'uvcvideo'); include card and bus info so each device gets its
+    # own schema
+    ident = b"-".join(
+        (cp.driver, cp.card, cp.bus_info)).decode("utf-8", "replace")
+    ident = "".join(c if c.isalnum() or c in "-_." else "-" for c in ident)
+    return os.path.expanduser("~/.pyvidctrl/" + ident + ".schema.json")
+
+
+def save_ctrls_schema(cp, ctrls):
+    """
+    Saves the enumerated control schema so future startups
+    on the same driver can skip the QUERYCTRL walks
+    """
+
+    schema = {}
+    for class_name, class_ctrls in ctrls.items():
+        schema[class_name] = [{
+            "ext": isinstance(c, v4l2_query_ext_ctrl),
+            "id": c.id,
+            "type": c.type,
+            "name": c.name.decode("utf-8"),
+            "minimum": c.minimum,
+            "maximum": c.maximum,
+            "step": c.step,
+            "default": c.default,
+            "flags": c.flags,
+            "elem_size": getattr(c, "elem_size", 0),
+        } for c in class_ctrls]
+
+    fname = ctrls_schema_fname(cp)
+    try:
+        os.makedirs(os.path.dirname(fname), exist_ok=True)
+        with open(fname, "w") as fd:
+            json.dump(schema, fd, indent=4)
+    except OSError:
+        # the cache is an optimization only
+        pass
+
+
+def load_ctrls_schema(cp):
+    """
+    Rebuilds the control structs from a previously saved schema
+    Returns None when there is no usable schema for this driver.
+    """
+
+    try:
+        with open(ctrls_schema_fname(cp), "r") as fd:
+            schema = json.load(fd)
+    except Exception:
+        return None
+
+    ctrls = {}
+    try:
+        for class_name, class_ctrls in schema.items():
+            ctrls[class_name] = []
+            for c in class_ctrls:
+                ctrl = v4l2_query_ext_ctrl() if c["ext"] else v4l2_queryctrl()
+                ctrl.id = c["id"]
+                ctrl.type = c["type"]
+                ctrl.name = c["name"].encode("utf-8")
+                ctrl.minimum = c["minimum"]
+                ctrl.maximum = c["maximum"]
+                ctrl.step = c["step"]
+                ctrl.default = c["default"]
+                ctrl.flags = c["flags"]
+                if c["ext"]:
+                    ctrl.elem_size = c["elem_size"]
+                ctrls[class_name].append(ctrl)
     except Exception:
-        return b"unknown"
+        # stale or hand-edited schema; re-enumerate
+        return None
+
+    return ctrls
 
 
 class App(Widget):
 
-    def __init__(self, device):
+    def __init__(self, device, use_schema_cache=True):
         self.running = True
         self.in_help = False
+        self.needs_redraw = True
+        self._last_layout = None
+        self._help_labels = None
+        self._title = Label("pyVidController - press ? for help")
+        self._no_ctrls_msg = Label(
+            "There are no controls available for camera")
 
         self.device = device
-        self.ctrls = query_ctrls(device)
-
-        if len(sum(self.ctrls.values(), start=[])) == 0:
+        self.capability = query_capability(device)
+        self.driver = (self.capability.driver
+                       if self.capability is not None else b"unknown")
+        self.driver_name = self.driver.decode("utf-8")
+
+        self.ctrls = None
+        if use_schema_cache and self.capability is not None:
+            self.ctrls = load_ctrls_schema(self.capability)
+        self._ctrls_from_cache = self.ctrls is not None
+
+        if self.ctrls is None:
+            self.ctrls = query_ctrls(device)
+            if use_schema_cache and self.capability is not None:
+                save_ctrls_schema(self.capability, self.ctrls)
+
+        self._total_ctrls = sum(map(len, self.ctrls.values()))
+        if self._total_ctrls == 0:
             return
 
         tab_titles = []
@@ -131,11 +268,10 @@ class App(Widget):
         for name, ctrls in self.ctrls.items():
             ctrl_widgets = []
             for ctrl in ctrls:
-                try:
-                    ctrl_widgets.append(CtrlWidget.create(device, ctrl))
-                except KeyError:
-                    # XXX quietly skip unsupported control types
-                    continue
+                cw = CtrlWidget.create(device, ctrl)
+                # XXX quietly skip unsupported control types
+                if cw is not None:
+                    ctrl_widgets.append(cw)
             if 0 < len(ctrl_widgets):
                 video_controllers.append(VideoController(device, ctrl_widgets))
                 tab_titles.append(name)
@@ -147,9 +283,22 @@ class App(Widget):
 
         curses.start_color()
         curses.noecho()
+        curses.cbreak()
         curses.curs_set(False)
         self.win.keypad(True)
-        curses.halfdelay(10)
+        # the cursor is hidden, so let curses leave it wherever a
+        # refresh ends instead of emitting repositioning escapes
+        self.win.leaveok(True)
+        self.win.idlok(True)
+        # a per-window timeout, unlike halfdelay, composes with the
+        # nodelay(True) the main loop uses to drain key bursts
+        if hasattr(self, "video_controller_tabs"):
+            self.idle_timeout = 1000
+        else:
+            # no controls means nothing on screen ever changes; wake
+            # rarely, just to notice quit keys and device unplug
+            self.idle_timeout = 5000
+        self.win.timeout(self.idle_timeout)
 
         try:
             curses.init_pair(1, curses.COLOR_BLUE, curses.COLOR_BLACK)
@@ -168,35 +317,53 @@ class App(Widget):
         self.in_help = not self.in_help
 
     def draw_help(self, window, w, h, x, y, color):
-        keys = {}
-        for kb in KeyBind.KEYBINDS:
-            help_texts = keys.setdefault(kb.display, [])
-            if kb.help_text not in help_texts:
-                help_texts.append(kb.help_text)
+        if self._help_labels is None:
+            self._help_labels = [
+                Label(f"{key:^3} - {help_text}")
+                for key, help_text in KeyBind.help_groups()
+            ]
 
-        for i, (key, help_texts) in enumerate(keys.items(), y):
-            Label(f"{key:^3} - {' / '.join(help_texts)}").draw(
-                window, w, h, x, i, color)
+        for i, label in enumerate(self._help_labels, y):
+            label.draw(window, w, h, x, i, color)
 
     def draw(self):
         h, w = self.win.getmaxyx()
 
-        self.win.erase()
-
-        title = Label("pyVidController - press ? for help")
-        title.draw(self.win, w, 1, 0, 0,
-                   curses.color_pair(2) | curses.A_REVERSE)
+        tabs = getattr(self, "video_controller_tabs", None)
+
+        # only wipe the screen when the layout itself changed; ordinary
+        # value updates are handled by damage tracking in the controllers
+        layout = (
+            h,
+            w,
+            self.in_help,
+            tabs.selected if tabs is not None else None,
+            CtrlWidget.show_statusline,
+        )
+        wiped = layout != self._last_layout
+        if wiped:
+            self.win.erase()
+            self._last_layout = layout
+            if tabs is not None:
+                for vc in tabs.widgets:
+                    vc.invalidate()
+
+            self._title.draw(self.win, w, 1, 0, 0,
+                             curses.color_pair(2) | curses.A_REVERSE)
 
         if self.in_help:
-            self.draw_help(self.win, w - 6, h - 2, 3, 2, curses.color_pair(0))
-            return
-
-        if len(sum(self.ctrls.values(), start=[])) == 0:
-            Label("There are no controls available for camera").draw(
-                self.win, w, 1, 2, 2, curses.color_pair(2))
-            return
-
-        self.video_controller_tabs.draw(self.win, w - 6, h - 2, 3, 2)
+            if wiped:
+                self.draw_help(self.win, w - 6, h - 2, 3, 2,
+                               curses.color_pair(0))
+        elif self._total_ctrls == 0:
+            if wiped:
+                self._no_ctrls_msg.draw(self.win, w, 1, 2, 2,
+                                        curses.color_pair(2))
+        elif tabs is not None:
+            tabs.draw(self.win, w - 6, h - 2, 3, 2)
+
+        self.win.noutrefresh()
+        curses.doupdate()
 
     def on_keypress(self, key):
         should_continue = True
@@ -206,24 +373,41 @@ class App(Widget):
         if should_continue:
             return super().on_keypress(key)
 
+    def drop_stale_schema(self):
+        """
+        Deletes this device's schema cache once any control loaded
+        from it turns out to not exist (the control set changed since
+        the cache was written), so the next startup re-enumerates
+        """
+
+        if not self._ctrls_from_cache:
+            return
+        if not hasattr(self, "video_controller_tabs"):
+            return
+
+        lost = any(cw._lost for vc in self.video_controller_tabs.widgets
+                   for cw in vc.ctrls)
+        if lost:
+            try:
+                os.unlink(ctrls_schema_fname(self.capability))
+            except OSError:
+                pass
+            self._ctrls_from_cache = False
+
     def store_ctrls(self, fname=None):
-        driver = query_driver(self.device)
-        fname = fname if fname else ".pyvidctrl-" + driver.decode("utf-8")
+        fname = fname if fname else ".pyvidctrl-" + self.driver_name
         if not hasattr(self, "video_controller_tabs"):
-            print(f"WARNING: Device {driver.decode('ascii')} has no controls")
+            print(f"WARNING: Device {self.driver_name} has no controls")
             with open(fname, "w") as fd:
                 json.dump([], fd, indent=4)
             return 0
 
-        flattened_cw = chain.from_iterable(
-            vc.ctrls for vc in self.video_controller_tabs.widgets)
-
         config = [{
             "id": cw.ctrl.id,
             "name": cw.name,
             "type": cw.ctrl.type,
             "value": cw.value,
-        } for cw in flattened_cw]
+        } for vc in self.video_controller_tabs.widgets for cw in vc.ctrls]
 
         with open(fname, "w") as fd:
             json.dump(config, fd, indent=4)
@@ -231,8 +415,7 @@ class App(Widget):
         return 0
 
     def restore_ctrls(self, fname=None):
-        driver = query_driver(self.device)
-        fname = fname if fname else ".pyvidctrl-" + driver.decode("utf-8")
+        fname = fname if fname else ".pyvidctrl-" + self.driver_name
         try:
             with open(fname, "r") as fd:
                 config = json.load(fd)
@@ -245,24 +428,53 @@ class App(Widget):
             return 1
 
         if not hasattr(self, "video_controller_tabs"):
-            print(f"WARNING: Device {driver.decode('ascii')} has no controls.")
+            print(f"WARNING: Device {self.driver_name} has no controls.")
             return 0
 
-        flattened_cw = chain.from_iterable(
-            vc.ctrls for vc in self.video_controller_tabs.widgets)
-
-        id_cw_mapping = {cw.ctrl.id: cw for cw in flattened_cw}
+        id_cw_mapping = {
+            cw.ctrl.id: cw
+            for vc in self.video_controller_tabs.widgets
+            for cw in vc.ctrls
+        }
 
+        # payload controls (strings) are written through their own
+        # setters; everything else is grouped by control class and
+        # pushed with one VIDIOC_S_EXT_CTRLS per class
+        by_class = {}
         for c in config:
             cw = id_cw_mapping.get(c["id"], None)
-            if cw is not None:
-                cw.value = c["value"]
-            else:
+            if cw is None:
                 print(
                     "Couldn't restore value of",
                     c["name"],
                     f"control (id: {c['id']})",
                 )
+            elif not cw.batchable:
+                cw.value = c["value"]
+            else:
+                ctrl_class = V4L2_CTRL_ID2CLASS(cw.ctrl.id)
+                by_class.setdefault(ctrl_class, []).append((cw, c["value"]))
+
+        for ctrl_class, group in by_class.items():
+            ectrl_arr = (v4l2_ext_control * len(group))()
+            for ectrl, (cw, value) in zip(ectrl_arr, group):
+                ectrl.id = cw.ctrl.id
+                if cw.ext_value64:
+                    ectrl.value64 = value
+                else:
+                    ectrl.value = value
+
+            ectrls = v4l2_ext_controls()
+            ectrls.ctrl_class = ctrl_class
+            ectrls.controls = ectrl_arr
+            ectrls.count = len(group)
+
+            try:
+                ioctl(self.device, VIDIOC_S_EXT_CTRLS, ectrls)
+            except OSError:
+                # driver refused the batch; write one by one instead
+                for cw, value in group:
+                    cw.value = value
 
         return 0
 
@@ -558,19 +770,37 @@ def main():
         help="Path to the camera device node or its ID",
         default="/dev/video0",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the cached control schema and re-enumerate the device",
+    )
+    parser.add_argument(
+        "--refresh-interval",
+        type=float,
+        default=CtrlWidget.poll_interval,
+        help="Seconds between value polls of volatile controls; "
+        "non-volatile controls poll at four times this interval",
+    )
 
     args = parser.parse_args()
 
+    if args.refresh_interval > 0:
+        CtrlWidget.poll_interval = args.refresh_interval
+        CtrlWidget.static_poll_interval = args.refresh_interval * 4
+
     if args.device.isdigit():
         args.device = "/dev/video" + args.device
 
     try:
-        device = open(args.device, "r")
+        # a raw fd avoids the buffered file wrapper and the per-ioctl
+        # fileno() lookup; O_NONBLOCK so the open itself cannot stall
+        device = os.open(args.device, os.O_RDONLY | os.O_NONBLOCK)
     except FileNotFoundError:
         print(f"There is no '{args.device}' device")
         return 1
 
-    app = App(device)
+    app = App(device, use_schema_cache=not args.no_cache)
 
     if args.store and args.restore:
         print("Cannot store and restore values at the same time!")
@@ -591,17 +821,47 @@ def main():
     signal.signal(signal.SIGINT, lambda s, f: app.end())
     app.start_tui()
 
+    next_device_check = 0.0
+
     while app.running:
-        app.draw()
+        if app.needs_redraw:
+            app.draw()
+            app.needs_redraw = False
 
         c = app.getch()
-        if 0 < c:
-            app.on_keypress(chr(c))
+        if c == -1:
+            # halfdelay timeout: refresh so volatile control
+            # values keep updating while idle
+            app.needs_redraw = True
+        else:
+            # key repeat queues keys faster than we repaint; handle the
+            # whole burst and pay for a single redraw at the end.
+            # Redraw only when a handler consumed a key or the terminal
+            # was resized; unhandled keys leave the screen untouched
+            app.win.nodelay(True)
+            while 0 < c:
+                if not app.on_keypress(chr(c)) or c == curses.KEY_RESIZE:
+                    app.needs_redraw = True
+                c = app.getch()
+            # nodelay(False) would mean block forever; go back to the
+            # idle timeout instead
+            app.win.timeout(app.idle_timeout)
+
+        # unplug detection does not need sub-second latency; one
+        # QUERYCTRL probe per second is plenty even under key repeat.
+        # A refresh error reported by any widget overrides the
+        # throttle so a dead device ends the app promptly
+        now = time.monotonic()
+        if CtrlWidget.io_error or now >= next_device_check:
+            CtrlWidget.io_error = False
+            if not is_valid_device(device):
+                app.end()
+                print("Disconnected")
+                break
+            app.drop_stale_schema()
+            next_device_check = now + 1.0
 
-        if not is_valid_device(device):
-            app.end()
-            print("Disconnected")
-            break
+    os.close(device)
 
 
 if __name__ == "__main__":
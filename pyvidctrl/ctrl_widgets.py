@@ -1,5 +1,8 @@
 import curses
+import errno
+import os
 import string
+import time
 from fcntl import ioctl
 
 from v4l2 import *
@@ -8,6 +11,38 @@ from .widgets import *
 
 KEY_ESCAPE = "\x1b"
 
+# nibble arithmetic tables for the bitmask editor; typed digits may be
+# uppercase, results are normalized to lowercase
+_HEX_DIGITS = "0123456789abcdef"
+_HEX_INDEX = {c: int(c, 16) for c in string.hexdigits}
+
+# fcntl.ioctl stages the argument through its own buffer on every call;
+# calling libc directly hands the kernel the ctypes struct memory itself,
+# which matters on the per-frame value paths
+_libc = ctypes.CDLL("libc.so.6", use_errno=True)
+_libc.ioctl.restype = ctypes.c_int
+_libc.ioctl.argtypes = (ctypes.c_int, ctypes.c_ulong, ctypes.c_void_p)
+
+
+def raw_ioctl(fd, request, arg):
+    """Direct libc ioctl on a ctypes struct, raising OSError on failure"""
+
+    if not isinstance(fd, int):
+        fd = fd.fileno()
+
+    if _libc.ioctl(fd, request, ctypes.addressof(arg)) < 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+
+def try_ioctl(fd, request, arg):
+    """Like raw_ioctl, but reports failure in the return value"""
+
+    if not isinstance(fd, int):
+        fd = fd.fileno()
+
+    return _libc.ioctl(fd, request, ctypes.addressof(arg)) == 0
+
 
 class CtrlWidget(Row):
     """
@@ -18,17 +53,87 @@ class CtrlWidget(Row):
     replace that with their specific widget.
     """
 
+    __slots__ = (
+        "device",
+        "ctrl",
+        "name",
+        "label",
+        "widget",
+        "_statusline",
+        "_statusline_key",
+        "_status_prefix",
+        "_cached_value",
+        "_seed",
+        "_has_seed",
+        "_read_ts",
+        "_lost",
+        "_display",
+        "_id",
+        "_min",
+        "_max",
+        "_step",
+        "_flags",
+        "_gctrl",
+        "_ectrl",
+        "_ectrls",
+    )
+
     show_statusline = False
 
+    # set whenever any widget's refresh hits an OSError, so the main
+    # loop can probe for unplug right away instead of on its next tick
+    io_error = False
+
+    # whether the value can be fetched with a batched VIDIOC_G_EXT_CTRLS
+    # and which union field of v4l2_ext_control carries it
+    batchable = True
+    ext_value64 = False
+
+    # how long a read value stays fresh before the device is asked
+    # again; volatile controls change behind our back and poll at the
+    # base rate, everything else only moves when some process writes
+    # it and can coast longer
+    poll_interval = 0.5
+    static_poll_interval = 2.0
+
     def __init__(self, device, ctrl):
         self.device = device
         self.ctrl = ctrl
+        # plain-int copies of the hot struct fields; every access to a
+        # ctypes field walks a descriptor and allocates a fresh int
+        self._id = ctrl.id
+        self._min = ctrl.minimum
+        self._max = ctrl.maximum
+        self._step = ctrl.step
+        self._flags = ctrl.flags
+        self._cached_value = None
+        self._seed = None
+        self._has_seed = False
+        self._read_ts = 0.0
+        self._lost = False
+
+        # reused across value reads and writes; constructing ctypes
+        # objects per ioctl costs more than the call itself
+        self._gctrl = v4l2_control()
+        self._gctrl.id = ctrl.id
+        self._ectrl = v4l2_ext_control()
+        self._ectrl.id = ctrl.id
+        self._ectrls = v4l2_ext_controls()
+        self._ectrls.controls = ctypes.pointer(self._ectrl)
+        self._ectrls.count = 1
 
         self.name = ctrl.name.decode("utf-8")
         self.label = Label(self.name)
         self.widget = Label("Not implemented!", align="center")
+        # the one child that actually renders the value; the name and
+        # spacer labels never look at it
+        self._display = self.widget
 
         self._statusline = Label("Statusline")
+        self._statusline_key = None
+        # static per control; subclasses fill it in and the statusline
+        # property only stitches in the live value and flags
+        self._status_prefix = None
 
         super().__init__(self.label, Label(""), self.widget, columns=(4, 1, 4))
 
@@ -37,62 +142,123 @@ class CtrlWidget(Row):
         """
         Creates and returns CtrlWidget depending
         on type of the passed ctrl
+        Returns None for unsupported control types.
         """
 
-        return {
-            V4L2_CTRL_TYPE_INTEGER: IntCtrl,
-            V4L2_CTRL_TYPE_BOOLEAN: BoolCtrl,
-            V4L2_CTRL_TYPE_MENU: MenuCtrl,
-            V4L2_CTRL_TYPE_BUTTON: ButtonCtrl,
-            V4L2_CTRL_TYPE_INTEGER64: Int64Ctrl,
-            V4L2_CTRL_TYPE_CTRL_CLASS: CtrlClassCtrl,
-            V4L2_CTRL_TYPE_STRING: StringCtrl,
-            V4L2_CTRL_TYPE_BITMASK: BitmaskCtrl,
-            V4L2_CTRL_TYPE_INTEGER_MENU: IntMenuCtrl,
-        }[ctrl.type](device, ctrl)
+        cls = _CTRL_TYPE_TABLE.get(ctrl.type)
+        return cls(device, ctrl) if cls is not None else None
 
     @property
     def value(self):
-        gctrl = v4l2_control()
-        gctrl.id = self.ctrl.id
-
         try:
-            ioctl(self.device, VIDIOC_G_CTRL, gctrl)
+            raw_ioctl(self.device, VIDIOC_G_CTRL, self._gctrl)
         except OSError:
             return None
 
-        return gctrl.value
+        return self._gctrl.value
 
     @value.setter
     def value(self, value):
-        sctrl = v4l2_control()
-        sctrl.id = self.ctrl.id
-        sctrl.value = value
+        self._gctrl.value = value
 
         try:
-            ioctl(self.device, VIDIOC_S_CTRL, sctrl)
+            raw_ioctl(self.device, VIDIOC_S_CTRL, self._gctrl)
         except OSError:
             # can fail as some controls can be read-only
             # both explicitly (by setting flag) or implicitly
             return
 
-    def update(self):
+        self._cached_value = value
+        self._read_ts = time.monotonic()
+
+    def seed_value(self, value):
         """
-        Updates child widgets with its value
-        Also re-query entire control to update flags
+        Accepts a value prefetched by a batched read
+        so the next update() can skip its own ioctl
         """
 
+        self._seed = value
+        self._has_seed = True
+
+    def needs_poll(self):
+        """Tells whether the cached value went stale"""
+
+        if self._flags & V4L2_CTRL_FLAG_VOLATILE:
+            interval = self.poll_interval
+        else:
+            interval = self.static_poll_interval
+
+        return time.monotonic() - self._read_ts >= interval
+
+    def needs_batch_read(self):
+        """Tells whether a batched read should include this control"""
+
+        return (self.batchable and self.needs_poll()
+                and not self._flags & V4L2_CTRL_FLAG_DISABLED)
+
+    def requery(self):
+        """Re-queries the control to pick up flag changes"""
+
         ctrl = v4l2_query_ext_ctrl()
-        ctrl.id = self.ctrl.id
-        ioctl(self.device, VIDIOC_QUERY_EXT_CTRL, ctrl)
+        ctrl.id = self._id
+        raw_ioctl(self.device, VIDIOC_QUERY_EXT_CTRL, ctrl)
         self.ctrl = ctrl
+        self._min = ctrl.minimum
+        self._max = ctrl.maximum
+        self._step = ctrl.step
+        self._flags = ctrl.flags
 
-        v = self.value
-        for w in self.widgets:
-            w.value = v
+    def update(self):
+        """
+        Updates child widgets with its value
+        The device is only asked again once the cached value went
+        stale (or a batched read seeded a fresh one); in between,
+        keypresses redraw from the cache without any ioctl.
+        """
+
+        try:
+            if self._has_seed:
+                self.requery()
+                self._cached_value = self._seed
+                self._has_seed = False
+                self._read_ts = time.monotonic()
+            elif self.needs_poll():
+                self.requery()
+                # don't keep re-reading a disabled control, but do read
+                # it at least once so the widgets have something to
+                # render; the flags still get polled so re-enabling is
+                # noticed
+                if (not self._flags & V4L2_CTRL_FLAG_DISABLED
+                        or self._cached_value is None):
+                    self._cached_value = self.value
+                self._read_ts = time.monotonic()
+        except OSError as e:
+            # the control is gone: the device is mid-unplug, or a
+            # schema cache from before a driver update names an id
+            # this device no longer has.  Keep the last known state
+            # dimmed, back off to poll cadence and let the main loop
+            # decide whether the whole device is dead
+            self._flags |= V4L2_CTRL_FLAG_DISABLED
+            if e.errno == errno.EINVAL:
+                self._lost = True
+            self._has_seed = False
+            self._read_ts = time.monotonic()
+            CtrlWidget.io_error = True
+
+        if self._display is not None:
+            self._display.value = self._cached_value
+
+    def render_state(self):
+        """
+        Returns the state its rendering depends on
+        Rows whose state did not change between draws
+        can be skipped by the owning VideoController.
+        """
+
+        return self._cached_value
 
     def get_flags_str(self):
-        flags = self.ctrl.flags
+        flags = self._flags
         ret = []
         if flags & V4L2_CTRL_FLAG_DISABLED:
             ret.append("disabled")
@@ -121,6 +287,18 @@ class CtrlWidget(Row):
 
     @property
     def statusline(self):
+        if self._status_prefix is None:
+            return self._statusline
+
+        # reformat only when the value or the flags actually moved
+        key = (self._cached_value, self._flags)
+        if key != self._statusline_key:
+            value, _ = key
+            flags = self.get_flags_str()
+            self._statusline.update(
+                f"{self._status_prefix}, {value=}, {flags=}")
+            self._statusline_key = key
+
         return self._statusline
 
     def toggle_statusline(self):
@@ -130,13 +308,7 @@ class CtrlWidget(Row):
         _, w = window.getmaxyx()
 
         self.statusline.draw(window, w, 1, 0, 0,
-                             curses.color_pair(3) | curses.A_REVERSE)
-
-    def draw(self, window, w, h, x, y, color):
-        """Updates itself and then draws"""
-
-        self.update()
-        super().draw(window, w, h, x, y, color)
+                             color_pair(3) | curses.A_REVERSE)
 
 
 class IntCtrl(CtrlWidget):
@@ -145,44 +317,46 @@ class IntCtrl(CtrlWidget):
     Uses LabeledBar to display its value
     """
 
+    __slots__ = ("bar", "_span")
+
+    status_type = "Integer"
+
     def __init__(self, device, ctrl):
         super().__init__(device, ctrl)
         self.bar = BarLabeled(ctrl.minimum, ctrl.maximum, self.value)
-        self.widgets[2] = self.bar
+        self.widgets[2] = self._display = self.bar
+        self._status_prefix = ", ".join((
+            f"type={self.status_type}",
+            f"minimum={ctrl.minimum}",
+            f"maximum={ctrl.maximum}",
+            f"step={ctrl.step}",
+            f"default={ctrl.default}",
+        ))
+
+        # the control range is fixed; keep the span for the integer
+        # percent arithmetic in change_percent
+        self._span = ctrl.maximum - ctrl.minimum
 
     def change_step(self, x):
-        self.set_value(self.value + x * self.ctrl.step)
+        self.set_value(self.value + x * self._step)
 
     def change_percent(self, x):
-        one_percent = (round((self.ctrl.maximum - self.ctrl.minimum) / 100)
-                       or self.ctrl.step)
-        self.set_value(self.value + x * one_percent)
+        # pure integer percent step, symmetric for both signs; never
+        # below one step, or the grid alignment in set_value would
+        # park the value where it is
+        inc = max(self._step, abs(x) * self._span // 100)
+        self.set_value(self.value + (inc if x > 0 else -inc))
 
     def set_value(self, value):
-        if value < self.ctrl.minimum:
-            self.value = self.ctrl.minimum
-        elif self.ctrl.maximum < value:
-            self.value = self.ctrl.maximum
-        else:
-            self.value = int(value)
-
-    @property
-    def statusline(self):
-        minimum = self.ctrl.minimum
-        maximum = self.ctrl.maximum
-        step = self.ctrl.step
-        default = self.ctrl.default
-        value = self.value
-        flags = self.get_flags_str()
-        return Label(", ".join((
-            "type=Integer",
-            f"{minimum=}",
-            f"{maximum=}",
-            f"{step=}",
-            f"{default=}",
-            f"{value=}",
-            f"{flags=}",
-        )))
+        value = int(max(self._min, min(self._max, value)))
+        if self._step > 0:
+            # snap to the nearest point of the step grid, the same
+            # rounding the kernel applies when validating the write
+            offset = value - self._min + self._step // 2
+            value = self._min + offset - offset % self._step
+            if value > self._max:
+                value -= self._step
+        self.value = value
 
 
 class BoolCtrl(CtrlWidget):
@@ -191,30 +365,26 @@ class BoolCtrl(CtrlWidget):
     Uses TrueFalse to display its value
     """
 
+    __slots__ = ()
+
     def __init__(self, device, ctrl):
         super().__init__(device, ctrl)
-        self.widgets[2] = TrueFalse(self.value)
+        self.widgets[2] = self._display = TrueFalse(self.value)
+        self._status_prefix = f"type=Boolean, default={ctrl.default}"
 
     def true(self):
-        self.value = True
+        if self._cached_value is None or not self._cached_value:
+            self.value = True
 
     def false(self):
-        self.value = False
+        if self._cached_value is None or self._cached_value:
+            self.value = False
 
     def neg(self):
-        self.value = not self.value
-
-    @property
-    def statusline(self):
-        default = self.ctrl.default
-        value = self.value
-        flags = self.get_flags_str()
-        return Label(", ".join((
-            "type=Boolean",
-            f"{default=}",
-            f"{value=}",
-            f"{flags=}",
-        )))
+        if self._cached_value is None:
+            self.value = not self.value
+        else:
+            self.value = not self._cached_value
 
 
 class MenuCtrl(CtrlWidget):
@@ -223,54 +393,78 @@ class MenuCtrl(CtrlWidget):
     Uses Menu to display its value
     """
 
+    __slots__ = ("menu", )
+
+    status_type = "Menu"
+
     def __init__(self, device, ctrl):
         super().__init__(device, ctrl)
 
+        # menu entries are enumerated lazily on first update; for
+        # devices with many menus this keeps VIDIOC_QUERYMENU storms
+        # out of startup entirely
+        self.menu = None
+        self._status_prefix = ", ".join((
+            f"type={self.status_type}",
+            f"minimum={ctrl.minimum}",
+            f"maximum={ctrl.maximum}",
+            f"default={ctrl.default}",
+        ))
+
+    def decode_option(self, querymenu):
+        return querymenu.name.decode("utf-8")
+
+    def _populate_options(self):
         querymenu = v4l2_querymenu()
-        querymenu.id = ctrl.id
+        querymenu.id = self._id
+
+        # querymenu fails for every hole in a sparse menu, and there
+        # can be far more holes than entries; checking the return code
+        # keeps exception unwinding out of the loop, and the local
+        # bindings keep attribute lookups out of it
+        probe = try_ioctl
+        dev = self.device
+        decode = self.decode_option
 
         options = {}
-        for i in range(ctrl.minimum, ctrl.maximum + 1):
+        for i in range(self._min, self._max + 1):
             querymenu.index = i
-            try:
-                ioctl(device, VIDIOC_QUERYMENU, querymenu)
-                options[i] = querymenu.name.decode("utf-8")
-            except OSError:
-                # querymenu can fail for given index, but there can
-                # still be more valid indexes
-                pass
+            if probe(dev, VIDIOC_QUERYMENU, querymenu):
+                options[i] = decode(querymenu)
+
+        if not options:
+            # a device that is mid-unplug answers every QUERYMENU with
+            # an error; keep the placeholder and retry on a later poll
+            return
 
         self.menu = Menu(options)
-        self.widgets[2] = self.menu
+        self.widgets[2] = self._display = self.menu
+
+    def update(self):
+        if self.menu is None and self.needs_poll():
+            self._populate_options()
+        super().update()
 
     def next(self):
         """Selects next option"""
 
+        if self.menu is None:
+            self._populate_options()
+        if self.menu is None:
+            return True
         self.menu.next()
         self.value = self.menu.value
 
     def prev(self):
         """Selects previous option"""
 
+        if self.menu is None:
+            self._populate_options()
+        if self.menu is None:
+            return True
         self.menu.prev()
         self.value = self.menu.value
 
-    @property
-    def statusline(self):
-        minimum = self.ctrl.minimum
-        maximum = self.ctrl.maximum
-        default = self.ctrl.default
-        value = self.value
-        flags = self.get_flags_str()
-        return Label(", ".join((
-            "type=Menu",
-            f"{minimum=}",
-            f"{maximum=}",
-            f"{default=}",
-            f"{value=}",
-            f"{flags=}",
-        )))
-
 
 class ButtonCtrl(CtrlWidget):
     """
@@ -278,9 +472,13 @@ class ButtonCtrl(CtrlWidget):
     Uses Button with 'Click me' text
     """
 
+    __slots__ = ()
+
+    batchable = False
+
     def __init__(self, device, ctrl):
         super().__init__(device, ctrl)
-        self.widgets[2] = Button("Click me")
+        self.widgets[2] = self._display = Button("Click me")
 
     def click(self):
         """
@@ -302,19 +500,22 @@ class ButtonCtrl(CtrlWidget):
         property method is reimplemented
         """
 
-        sctrl = v4l2_control()
-        sctrl.id = self.ctrl.id
-        sctrl.value = value
+        self._gctrl.value = value
 
         try:
-            ioctl(self.device, VIDIOC_S_CTRL, sctrl)
+            raw_ioctl(self.device, VIDIOC_S_CTRL, self._gctrl)
         except OSError:
             return
 
     @property
     def statusline(self):
-        flags = self.get_flags_str()
-        return Label(f"type=Button, {flags=}")
+        key = (None, self._flags)
+        if key != self._statusline_key:
+            flags = self.get_flags_str()
+            self._statusline.update(f"type=Button, {flags=}")
+            self._statusline_key = key
+
+        return self._statusline
 
 
 class Int64Ctrl(IntCtrl):
@@ -323,56 +524,33 @@ class Int64Ctrl(IntCtrl):
     Same as Integer one, except for statusline
     """
 
-    @property
-    def value(self):
-        ectrl = v4l2_ext_control()
-        ectrl.id = self.ctrl.id
+    __slots__ = ()
 
-        ectrls = v4l2_ext_controls()
-        ectrls.controls = ctypes.pointer(ectrl)
-        ectrls.count = 1
+    ext_value64 = True
+    status_type = "Integer64"
 
+    @property
+    def value(self):
         try:
-            ioctl(self.device, VIDIOC_G_EXT_CTRLS, ectrls)
+            raw_ioctl(self.device, VIDIOC_G_EXT_CTRLS, self._ectrls)
         except OSError:
             return None
 
-        return ectrl.value64
+        return self._ectrl.value64
 
     @value.setter
     def value(self, value):
-        ectrl = v4l2_ext_control()
-        ectrl.id = self.ctrl.id
-        ectrl.value64 = value
-
-        ectrls = v4l2_ext_controls()
-        ectrls.controls = ctypes.pointer(ectrl)
-        ectrls.count = 1
+        self._ectrl.value64 = value
 
         try:
-            ioctl(self.device, VIDIOC_S_EXT_CTRLS, ectrls)
+            raw_ioctl(self.device, VIDIOC_S_EXT_CTRLS, self._ectrls)
         except OSError:
             # can fail as some controls can be read-only
             # both explicitly (by setting flag) or implicitly
             return
 
-    @property
-    def statusline(self):
-        minimum = self.ctrl.minimum
-        maximum = self.ctrl.maximum
-        step = self.ctrl.step
-        default = self.ctrl.default
-        value = self.value
-        flags = self.get_flags_str()
-        return Label(", ".join((
-            "type=Integer64",
-            f"{minimum=}",
-            f"{maximum=}",
-            f"{step=}",
-            f"{default=}",
-            f"{value=}",
-            f"{flags=}",
-        )))
+        self._cached_value = value
+        self._read_ts = time.monotonic()
 
 
 class CtrlClassCtrl(CtrlWidget):
@@ -382,10 +560,17 @@ class CtrlClassCtrl(CtrlWidget):
     as it's just a category name control
     """
 
+    __slots__ = ()
+
     def __init__(self, device, ctrl):
         super().__init__(device, ctrl)
         self.widgets = [Label(self.name, align="center")]
         self.columns = (1, )
+        self._col_total = 1
+        self._display = None
+
+    def render_state(self):
+        return self.name
 
 
 class StringCtrl(CtrlWidget):
@@ -403,28 +588,39 @@ class StringCtrl(CtrlWidget):
     are appended at the end.
     """
 
+    __slots__ = ("text_field", "_str_buf")
+
+    # string payloads need a per-control buffer, see the value property
+    batchable = False
+
     def __init__(self, device, ctrl):
         super().__init__(device, ctrl)
+
+        # one payload buffer for the control's lifetime; reads and
+        # writes go through it instead of allocating per access
+        self._str_buf = ctypes.create_string_buffer(ctrl.maximum + 1)
+        self._ectrl.size = ctrl.elem_size
+        self._ectrl.string = ctypes.cast(self._str_buf, ctypes.c_char_p)
+
         self.text_field = TextField(self.value)
-        self.widgets[2] = self.text_field
+        self.widgets[2] = self._display = self.text_field
+        self._status_prefix = ", ".join((
+            "type=String",
+            f"minimum={ctrl.minimum}",
+            f"maximum={ctrl.maximum}",
+            f"default={ctrl.default}",
+        ))
 
     @property
     def value(self):
-        ectrl = v4l2_ext_control()
-        ectrl.id = self.ctrl.id
-        ectrl.size = self.ctrl.elem_size
-        ectrl.string = bytes(self.ctrl.maximum + 1)
-
-        ectrls = v4l2_ext_controls()
-        ectrls.controls = ctypes.pointer(ectrl)
-        ectrls.count = 1
+        ctypes.memset(self._str_buf, 0, ctypes.sizeof(self._str_buf))
 
         try:
-            ioctl(self.device, VIDIOC_G_EXT_CTRLS, ectrls)
+            raw_ioctl(self.device, VIDIOC_G_EXT_CTRLS, self._ectrls)
         except OSError:
             return None
 
-        return ectrl.string.decode("utf-8")
+        return self._str_buf.value.decode("utf-8")
 
     @value.setter
     def value(self, value):
@@ -432,55 +628,47 @@ class StringCtrl(CtrlWidget):
         if len(value) < self.ctrl.minimum:
             value = " " * self.ctrl.minimum
 
-        ectrl = v4l2_ext_control()
-        ectrl.id = self.ctrl.id
-        ectrl.string = value.encode("utf-8")
-        ectrl.size = self.ctrl.elem_size
-
-        ectrls = v4l2_ext_controls()
-        ectrls.controls = ctypes.pointer(ectrl)
-        ectrls.count = 1
+        # copy into the persistent buffer; anything beyond maximum
+        # would not fit the control anyway
+        data = value.encode("utf-8")[:self.ctrl.maximum]
+        ctypes.memset(self._str_buf, 0, ctypes.sizeof(self._str_buf))
+        self._str_buf.value = data
 
         try:
-            ioctl(self.device, VIDIOC_S_EXT_CTRLS, ectrls)
+            raw_ioctl(self.device, VIDIOC_S_EXT_CTRLS, self._ectrls)
         except OSError:
             # can fail as some controls can be read-only
             # both explicitly (by setting flag) or implicitly
             return
 
+        self._cached_value = value
+        self._read_ts = time.monotonic()
+
     def on_keypress(self, key):
         in_edit = self.text_field.in_edit
 
         if in_edit and key == "\n":
             self.text_field.edit()
-            self.value = self.text_field.buffer
+            self.value = self.text_field.value
         elif in_edit and ord(key) == curses.KEY_BACKSPACE:
-            self.text_field.buffer = self.text_field.buffer[:-1]
+            if self.text_field.buffer:
+                self.text_field.buffer.pop()
         elif in_edit and key == KEY_ESCAPE:
             self.text_field.abort()
         elif in_edit:
-            if len(self.text_field.buffer) < self.ctrl.maximum:
-                self.text_field.buffer += key
+            if len(self.text_field.buffer) < self._max:
+                self.text_field.buffer.append(key)
         elif key == "\n":
             self.text_field.edit()
         else:
             return super().on_keypress(key)
 
-    @property
-    def statusline(self):
-        minimum = self.ctrl.minimum
-        maximum = self.ctrl.maximum
-        default = self.ctrl.default
-        value = self.value
-        flags = self.get_flags_str()
-        return Label(", ".join((
-            "type=String",
-            f"{minimum=}",
-            f"{maximum=}",
-            f"{default=}",
-            f"{value=}",
-            f"{flags=}",
-        )))
+    def render_state(self):
+        if self.text_field.in_edit:
+            # snapshot: the live buffer list mutates in place and must
+            # not leak into the damage cache by reference
+            return (True, "".join(self.text_field.buffer))
+        return (False, self.text_field.value)
 
 
 class BitmaskCtrl(CtrlWidget):
@@ -490,20 +678,27 @@ class BitmaskCtrl(CtrlWidget):
     Limits possible characters to valid hex digits.
     """
 
+    __slots__ = ("edit_widget", )
+
+    ext_value64 = True
+
     class BitmaskEditWidget(Widget):
 
+        __slots__ = ("in_edit", "selected", "buffer")
+
         def __init__(self, value=0):
             self.value = value
             self.in_edit = False
             self.selected = 0
 
         def draw(self, window, w, h, x, y, color):
-            render = (self.buffer if self.in_edit else self.value.to_bytes(
-                4, "big").hex())
+            # an unreadable control leaves value at None; render zeros
+            value = 0 if self.value is None else self.value
+            render = self.buffer if self.in_edit else format(value, "08x")
 
             if self.in_edit:
                 left_w = (w - len(render) + 1) // 2
-                safe_addstr(window, y, x, " " * left_w, color)
+                safe_addstr(window, y, x, spaces(left_w), color)
                 x += left_w
 
                 sel = self.selected
@@ -517,7 +712,7 @@ class BitmaskCtrl(CtrlWidget):
                 x += len(render) - sel - 1
 
                 right_w = w - len(render) - left_w
-                safe_addstr(window, y, x, " " * right_w, color)
+                safe_addstr(window, y, x, spaces(right_w), color)
             else:
                 safe_addstr(window, y, x, render.center(w), color)
 
@@ -536,14 +731,14 @@ class BitmaskCtrl(CtrlWidget):
         def inc(self):
             if self.in_edit:
                 sel = self.selected
-                self.set(hex((int(self.buffer[sel], 16) + 1) % 16)[2:])
+                self.set(_HEX_DIGITS[(_HEX_INDEX[self.buffer[sel]] + 1) & 15])
             else:
                 return True
 
         def dec(self):
             if self.in_edit:
                 sel = self.selected
-                self.set(hex((int(self.buffer[sel], 16) - 1) % 16)[2:])
+                self.set(_HEX_DIGITS[(_HEX_INDEX[self.buffer[sel]] - 1) & 15])
             else:
                 return True
 
@@ -557,10 +752,10 @@ class BitmaskCtrl(CtrlWidget):
             """
 
             if not self.in_edit:
-                self.buffer = self.value.to_bytes(4, "big").hex()
+                self.buffer = format(self.value or 0, "08x")
                 self.in_edit = True
             else:
-                self.value = int.from_bytes(bytes.fromhex(self.buffer), "big")
+                self.value = int(self.buffer, 16)
                 self.in_edit = False
 
         def abort(self):
@@ -570,45 +765,42 @@ class BitmaskCtrl(CtrlWidget):
             """
 
             self.in_edit = False
-            self.buffer = self.value.to_bytes(4, "big").hex()
+            self.buffer = format(self.value or 0, "08x")
 
     def __init__(self, device, ctrl):
         super().__init__(device, ctrl)
         self.edit_widget = BitmaskCtrl.BitmaskEditWidget(self.value)
-        self.widgets[2] = self.edit_widget
+        self.widgets[2] = self._display = self.edit_widget
+        self._status_prefix = ", ".join((
+            "type=Bitmask",
+            f"minimum={ctrl.minimum}",
+            f"maximum={ctrl.maximum}",
+            f"default={ctrl.default}",
+        ))
 
     @property
     def value(self):
-        ectrl = v4l2_ext_control()
-        ectrls = v4l2_ext_controls()
-        ectrl.id = self.ctrl.id
-        ectrls.controls = ctypes.pointer(ectrl)
-        ectrls.count = 1
-
         try:
-            ioctl(self.device, VIDIOC_G_EXT_CTRLS, ectrls)
+            raw_ioctl(self.device, VIDIOC_G_EXT_CTRLS, self._ectrls)
         except OSError:
             return None
 
-        return ectrl.value64
+        return self._ectrl.value64
 
     @value.setter
     def value(self, value):
-        ectrl = v4l2_ext_control()
-        ectrl.id = self.ctrl.id
-        ectrl.value64 = value
-
-        ectrls = v4l2_ext_controls()
-        ectrls.controls = ctypes.pointer(ectrl)
-        ectrls.count = 1
+        self._ectrl.value64 = value
 
         try:
-            ioctl(self.device, VIDIOC_S_EXT_CTRLS, ectrls)
+            raw_ioctl(self.device, VIDIOC_S_EXT_CTRLS, self._ectrls)
         except OSError:
             # can fail as some controls can be read-only
             # both explicitly (by setting flag) or implicitly
             return
 
+        self._cached_value = value
+        self._read_ts = time.monotonic()
+
     def on_keypress(self, key):
         ALLOWED_CHARS = string.hexdigits
         in_edit = self.edit_widget.in_edit
@@ -638,21 +830,11 @@ class BitmaskCtrl(CtrlWidget):
     def dec(self):
         return self.edit_widget.dec()
 
-    @property
-    def statusline(self):
-        minimum = self.ctrl.minimum
-        maximum = self.ctrl.maximum
-        default = self.ctrl.default
-        value = self.value
-        flags = self.get_flags_str()
-        return Label(", ".join((
-            "type=Bitmask",
-            f"{minimum=}",
-            f"{maximum=}",
-            f"{default=}",
-            f"{value=}",
-            f"{flags=}",
-        )))
+    def render_state(self):
+        ew = self.edit_widget
+        if ew.in_edit:
+            return (True, ew.buffer, ew.selected)
+        return (False, ew.value)
 
 
 class IntMenuCtrl(MenuCtrl):
@@ -662,38 +844,24 @@ class IntMenuCtrl(MenuCtrl):
     of its values, as they are numbers.
     """
 
-    def __init__(self, device, ctrl):
-        super().__init__(device, ctrl)
+    __slots__ = ()
 
-        querymenu = v4l2_querymenu()
-        querymenu.id = ctrl.id
+    status_type = "IntMenu"
 
-        options = {}
-        for i in range(ctrl.minimum, ctrl.maximum + 1):
-            querymenu.index = i
-            try:
-                ioctl(device, VIDIOC_QUERYMENU, querymenu)
-                options[i] = int.from_bytes(querymenu.name, "little")
-            except OSError:
-                # querymenu can fail for given index, but there can
-                # still be more valid indexes
-                pass
+    def decode_option(self, querymenu):
+        return int.from_bytes(querymenu.name, "little")
 
-        self.menu = Menu(options)
-        self.widgets[2] = self.menu
 
-    @property
-    def statusline(self):
-        minimum = self.ctrl.minimum
-        maximum = self.ctrl.maximum
-        default = self.ctrl.default
-        value = self.value
-        flags = self.get_flags_str()
-        return Label(", ".join((
-            "type=IntMenu",
-            f"{minimum=}",
-            f"{maximum=}",
-            f"{default=}",
-            f"{value=}",
-            f"{flags=}",
-        )))
+# built once after all widget classes exist; CtrlWidget.create dispatches
+# through it instead of rebuilding a dict per control
+_CTRL_TYPE_TABLE = {
+    V4L2_CTRL_TYPE_INTEGER: IntCtrl,
+    V4L2_CTRL_TYPE_BOOLEAN: BoolCtrl,
+    V4L2_CTRL_TYPE_MENU: MenuCtrl,
+    V4L2_CTRL_TYPE_BUTTON: ButtonCtrl,
+    V4L2_CTRL_TYPE_INTEGER64: Int64Ctrl,
+    V4L2_CTRL_TYPE_CTRL_CLASS: CtrlClassCtrl,
+    V4L2_CTRL_TYPE_STRING: StringCtrl,
+    V4L2_CTRL_TYPE_BITMASK: BitmaskCtrl,
+    V4L2_CTRL_TYPE_INTEGER_MENU: IntMenuCtrl,
+}
@@ -1,8 +1,14 @@
 import curses
+from itertools import islice
 
 from .widgets import *
 from .ctrl_widgets import *
 
+# flag combination that renders a control dimmed
+_DIM_MASK = (V4L2_CTRL_FLAG_DISABLED
+             | V4L2_CTRL_FLAG_READ_ONLY
+             | V4L2_CTRL_FLAG_INACTIVE)
+
 
 class VideoController(Widget):
     """Aggregates multiple CtrlWigets, manages and draws them."""
@@ -11,32 +17,81 @@ class VideoController(Widget):
         self.ctrls = [c for c in ctrls if not isinstance(c, CtrlClassCtrl)]
         self.device = device
         self.visible_ctrls = slice(0, len(ctrls))
-        self.selected_ctrl = -1
-        for i, c in enumerate(self.ctrls):
-            if not isinstance(c, CtrlClassCtrl):
-                self.selected_ctrl = i
-                break
+        # the comprehension above already removed the class headers,
+        # so the first entry (if any) is always selectable
+        self.selected_ctrl = 0 if self.ctrls else -1
+        self._drawn_rows = {}
+        self._batch_ids = None
+
+    def invalidate(self):
+        """Forgets drawn row state, forcing a full redraw on next draw"""
+
+        self._drawn_rows.clear()
+
+    def fetch_values(self, ctrls):
+        """
+        Reads values of many controls with a single
+        VIDIOC_G_EXT_CTRLS ioctl and seeds their widgets.
+        On failure widgets simply fall back to their own reads.
+        """
+
+        batch = [c for c in ctrls if c.needs_batch_read()]
+        if not batch:
+            return
+
+        # successive polls usually cover the same controls, so keep the
+        # ctypes array around and rebuild it only when the set changes
+        ids = tuple(c._id for c in batch)
+        if ids != self._batch_ids:
+            self._batch_arr = (v4l2_ext_control * len(batch))()
+            for ectrl, c in zip(self._batch_arr, batch):
+                ectrl.id = c._id
+
+            self._batch_ectrls = v4l2_ext_controls()
+            self._batch_ectrls.controls = self._batch_arr
+            self._batch_ectrls.count = len(batch)
+            self._batch_ids = ids
+
+        try:
+            raw_ioctl(self.device, VIDIOC_G_EXT_CTRLS, self._batch_ectrls)
+        except OSError:
+            # some drivers reject mixed-class batches
+            return
+
+        for ectrl, c in zip(self._batch_arr, batch):
+            c.seed_value(ectrl.value64 if c.ext_value64 else ectrl.value)
 
     def draw(self, window, w, h, x, y):
-        """Draws each widget on every other line."""
+        """
+        Draws each widget on every other line.
+        Rows whose rendered state did not change since the previous
+        draw are skipped, so a repaint only touches what moved.
+        """
 
         assert 0 <= self.selected_ctrl < len(self.ctrls)
         self.visible_ctrls = slice(self.visible_ctrls.start,
                                    self.visible_ctrls.start + h // 2)
 
-        for i, c in enumerate(self.ctrls[self.visible_ctrls],
-                              self.visible_ctrls.start):
-            f = self.get_format(c)
+        vcs = self.visible_ctrls
+        self.fetch_values(islice(self.ctrls, vcs.start, vcs.stop))
+
+        for i, c in enumerate(islice(self.ctrls, vcs.start, vcs.stop),
+                              vcs.start):
+            f = curses.A_NORMAL
 
             if self.selected_ctrl == i:
-                f |= curses.color_pair(3) | curses.A_BOLD
+                f |= color_pair(3) | curses.A_BOLD
 
-            if c.ctrl.flags & (V4L2_CTRL_FLAG_DISABLED
-                               | V4L2_CTRL_FLAG_READ_ONLY
-                               | V4L2_CTRL_FLAG_INACTIVE):
+            if c._flags & _DIM_MASK:
                 f |= curses.A_DIM
 
-            c.draw(window, w, 1, x, y, f)
+            c.update()
+
+            row = i - self.visible_ctrls.start
+            state = (c._id, c.render_state(), f, w)
+            if self._drawn_rows.get(row) != state:
+                c.draw(window, w, 1, x, y, f)
+                self._drawn_rows[row] = state
 
             if self.selected_ctrl == i and CtrlWidget.show_statusline:
                 c.draw_statusline(window)
@@ -54,9 +109,6 @@ class VideoController(Widget):
         elif sc >= vcs.stop:
             self.visible_ctrls = slice(vcs.start + 1, vcs.stop + 1)
 
-        if isinstance(self.ctrls[self.selected_ctrl], CtrlClassCtrl):
-            self.next()
-
     def prev(self):
         """Selects previous CtrlWidget"""
 
@@ -68,9 +120,6 @@ class VideoController(Widget):
         elif sc < vcs.start:
             self.visible_ctrls = slice(vcs.start - 1, vcs.stop - 1)
 
-        if isinstance(self.ctrls[self.selected_ctrl], CtrlClassCtrl):
-            self.prev()
-
     def on_keypress(self, key):
         """
         First lets selected widget resolve the keypress.
@@ -90,10 +139,3 @@ class VideoController(Widget):
     def set_default_all(self):
         for c in self.ctrls:
             c.value = c.ctrl.default
-
-    def get_format(self, ctrl):
-        """Returns format specific to the CtrlWidget class."""
-
-        return {
-            CtrlClassCtrl: curses.color_pair(1) | curses.A_UNDERLINE,
-        }.get(type(ctrl), curses.A_NORMAL)
@@ -1,24 +1,65 @@
 import curses
+from functools import lru_cache
+
+_color_pairs = {}
+
+
+def color_pair(n):
+    """curses.color_pair memoized; only valid once curses is initialized"""
+
+    attr = _color_pairs.get(n)
+    if attr is None:
+        attr = _color_pairs[n] = curses.color_pair(n)
+
+    return attr
 
 
 def safe_addstr(window, y, x, string, attr=None):
     try:
-        window.addstr(y, x, string, attr or curses.color_pair(0))
+        window.addstr(y, x, string, attr or color_pair(0))
     except curses.error:
         # curses by design throw exception after writing to lower right corner
         # https://docs.python.org/3/library/curses.html#curses.window.addstr
         pass
 
 
-def calc_width(current, total):
+def safe_hline(window, y, x, char, width, attr=None):
+    try:
+        window.hline(y, x, ord(char) | (attr or color_pair(0)), width)
+    except curses.error:
+        # same corner case as in safe_addstr
+        pass
+
+
+def safe_chgat(window, y, x, width, attr):
     try:
-        return round(current / total)
-    except ZeroDivisionError:
+        window.chgat(y, x, width, attr)
+    except curses.error:
+        # same corner case as in safe_addstr
+        pass
+
+
+@lru_cache(maxsize=256)
+def spaces(n):
+    """Cached run of blanks; distinct widths are bounded by the terminal"""
+
+    return " " * n
+
+
+def calc_width(current, total):
+    if total <= 0:
         return 0
 
+    # integer round-half-up of current/total, avoiding the float round-trip
+    return (2 * current + total) // (2 * total)
+
 
 class KeyBind:
+    __slots__ = ("cls", "key", "handler", "help_text", "display")
+
     KEYBINDS = []
+    BY_CLS = {}
+    _help_groups = None
 
     def __init__(self, cls, key, handler, help_text, display=None):
         assert callable(handler)
@@ -34,17 +75,45 @@ class KeyBind:
         self.display = display or key
 
         KeyBind.KEYBINDS.append(self)
+        KeyBind.BY_CLS.setdefault(cls, {})[key] = self
+        KeyBind._help_groups = None
+
+    @classmethod
+    def help_groups(cls):
+        """
+        Returns help texts grouped by displayed key,
+        as a cached list of (display, joined texts) pairs
+        """
+
+        if cls._help_groups is None:
+            keys = {}
+            for kb in cls.KEYBINDS:
+                help_texts = keys.setdefault(kb.display, [])
+                if kb.help_text not in help_texts:
+                    help_texts.append(kb.help_text)
+
+            cls._help_groups = [(key, " / ".join(texts))
+                                for key, texts in keys.items()]
+
+        return cls._help_groups
 
     @staticmethod
     def get_handler(cls, key):
-        """Search and return key handler registered for `cls` and `key`"""
+        """
+        Search and return key handler registered for `cls` and `key`
+        Walks the MRO, so a subclass inherits its parents' binds
+        unless it registers the same key itself.
+        """
+
+        by_cls = KeyBind.BY_CLS
+        for c in cls.__mro__:
+            binds = by_cls.get(c)
+            if binds is not None:
+                handler = binds.get(key)
+                if handler is not None:
+                    return handler
 
-        try:
-            return next(
-                filter(lambda k: k.cls == cls and k.key == key,
-                       KeyBind.KEYBINDS))
-        except StopIteration:
-            return None
+        return None
 
     def __call__(self, other):
         return self.handler(other)
@@ -52,13 +121,10 @@ class KeyBind:
 
 class Widget:
 
-    @property
-    def value(self):
-        return self._value
-
-    @value.setter
-    def value(self, value):
-        self._value = value
+    # a plain slot: only widgets that derive or coerce their value
+    # (Menu, TextField, the control widgets) override it with a
+    # property, everyone else gets a C-level attribute store
+    __slots__ = ("value", )
 
     def draw(self, window, w, h, x, y, color):
         """
@@ -95,21 +161,35 @@ class Row(Widget):
     fill given space.
     """
 
+    __slots__ = ("widgets", "columns", "_col_total")
+
     def __init__(self, *widgets, columns=None):
         self.widgets = list(widgets)
         self.columns = columns or [1 for _ in widgets]
+        self._col_total = sum(self.columns)
         assert len(self.columns) == len(self.widgets)
 
     def draw(self, window, w, h, x, y, color):
-        total = 0
-        for i, (widget, col) in enumerate(zip(self.widgets, self.columns)):
-            if i == len(self.widgets) - 1:
-                widget_w = w - total
-            else:
-                widget_w = calc_width(w * col, sum(self.columns))
-            if widget_w > 0:
-                widget.draw(window, widget_w, h, x + total, y, color)
-                total += widget_w
+        # classic integer apportionment: each child ends at the scaled
+        # cumulative column position, so the widths sum to exactly w
+        # and the final widget needs no special casing
+        total = self._col_total
+        cum = 0
+        issued = 0
+        for widget, col in zip(self.widgets, self.columns):
+            cum += col
+            end = w * cum // total
+            if end > issued:
+                widget.draw(window, end - issued, h, x + issued, y, color)
+            issued = end
+
+
+# alignment name to the str method that implements it
+_ALIGN_PAD = {
+    "left": str.ljust,
+    "center": str.center,
+    "right": str.rjust,
+}
 
 
 class Label(Widget):
@@ -120,26 +200,34 @@ class Label(Widget):
     and one character '…' ellipsis is added at the end.
     """
 
+    __slots__ = ("text", "align", "_pad", "_text_len", "_render_key",
+                 "_render")
+
     def __init__(self, text="", align="left"):
-        assert align in ["left", "center", "right"]
         self.text = str(text)
         self.align = align
+        self._pad = _ALIGN_PAD[align]
+        self._text_len = len(self.text)
+        self._render_key = None
+        self._render = ""
 
     def update(self, value):
         self.text = str(value)
+        self._text_len = len(self.text)
 
     def draw(self, window, w, h, x, y, color):
-        render = ""
-        if len(self.text) > w:
-            render = self.text[:w - 1] + "…"
-        elif self.align == "left":
-            render = self.text.ljust(w)
-        elif self.align == "center":
-            render = self.text.center(w)
-        elif self.align == "right":
-            render = self.text.rjust(w)
+        # trimming/padding only depends on the text and width; reuse
+        # the rendered string while neither changes
+        key = (self.text, w)
+        if key != self._render_key:
+            if self._text_len > w:
+                # one formatting allocation instead of slice + concat
+                self._render = f"{self.text[:w - 1]}…"
+            else:
+                self._render = self._pad(self.text, w)
+            self._render_key = key
 
-        safe_addstr(window, y, x, render, color)
+        safe_addstr(window, y, x, self._render, color)
 
 
 class TextField(Widget):
@@ -148,25 +236,35 @@ class TextField(Widget):
     Doesn't resolve events on its own.
     Requires another widget witch will catch events
     for it and manipulate its state.
+
+    While in edit mode the text lives in `buffer`, a list of
+    characters, so each keystroke appends or pops in O(1)
+    instead of rebuilding an immutable string.
     """
 
+    __slots__ = ("align", "_pad", "in_edit", "buffer", "_value")
+
     def __init__(self, value="", align="left"):
-        assert align in ["left", "center", "right"]
-        self.value = str(value)
+        self.value = value
         self.align = align
+        self._pad = _ALIGN_PAD[align]
         self.in_edit = False
 
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        # coerce once on assignment; draw used to re-coerce per frame
+        self._value = str(value)
+
     def draw(self, window, w, h, x, y, color):
-        self.value = str(self.value)
-        render = self.buffer if self.in_edit else self.value
+        render = "".join(self.buffer) if self.in_edit else self.value
         if len(render) > w:
             render = render[:w - 1] + "…"
-        elif self.align == "left":
-            render = render.ljust(w)
-        elif self.align == "center":
-            render = render.center(w)
-        elif self.align == "right":
-            render = render.rjust(w)
+        else:
+            render = self._pad(render, w)
 
         f = color | curses.A_ITALIC
 
@@ -185,10 +283,10 @@ class TextField(Widget):
         """
 
         if not self.in_edit:
-            self.buffer = self.value
+            self.buffer = list(self.value)
             self.in_edit = True
         else:
-            self.value = self.buffer
+            self.value = "".join(self.buffer)
             self.in_edit = False
 
     def abort(self):
@@ -207,6 +305,8 @@ class Checkbox(Widget):
     draws empty or checked box.
     """
 
+    __slots__ = ()
+
     def __init__(self, value=False):
         self.value = value
 
@@ -222,6 +322,8 @@ class TrueFalse(Widget):
     checks box of one of them
     """
 
+    __slots__ = ()
+
     def __init__(self, value=False):
         self.value = value
 
@@ -233,10 +335,13 @@ class TrueFalse(Widget):
             fbox, tbox = tbox, fbox
             fcolor, tcolor = tcolor, fcolor
 
-        Label(fbox + " False", align="center").draw(window, w // 2, h, x, y,
-                                                    fcolor)
-        Label(tbox + " True", align="center").draw(window, w - w // 2, h,
-                                                   x + w // 2, y, tcolor)
+        # the two halves are short constant strings; write them
+        # directly instead of allocating throwaway Labels
+        lw = w // 2
+        rw = w - lw
+        safe_addstr(window, y, x, (fbox + " False").center(lw)[:lw], fcolor)
+        safe_addstr(window, y, x + lw, (tbox + " True").center(rw)[:rw],
+                    tcolor)
 
 
 class Menu(Widget):
@@ -248,14 +353,18 @@ class Menu(Widget):
     is first or last, hides one of the arrows.
     """
 
+    __slots__ = ("options", "keys", "_index", "_n", "selected")
+
     def __init__(self, options={}, selected=None):
         self.options = options
         self.keys = list(options.keys())
-        assert 0 < len(self.keys)
+        self._index = {k: i for i, k in enumerate(self.keys)}
+        self._n = len(self.keys)
+        assert 0 < self._n
 
         if selected is not None:
-            assert selected in options.keys()
-            self.selected = self.keys.index(selected)
+            assert selected in options
+            self.selected = self._index[selected]
         else:
             self.selected = 0
 
@@ -265,20 +374,19 @@ class Menu(Widget):
 
     @value.setter
     def value(self, value):
-        if value is not None and value in self.options.keys():
-            self.selected = self.keys.index(value)
+        i = self._index.get(value)
+        if i is not None:
+            self.selected = i
 
     def next(self):
-        if self.selected + 1 <= len(self.keys) - 1:
-            self.selected = self.selected + 1
+        self.selected = min(self.selected + 1, self._n - 1)
 
     def prev(self):
-        if self.selected - 1 >= 0:
-            self.selected = self.selected - 1
+        self.selected = max(self.selected - 1, 0)
 
     def draw(self, window, w, h, x, y, color):
         pre = "<" if self.selected > 0 else " "
-        post = ">" if self.selected < len(self.keys) - 1 else " "
+        post = ">" if self.selected < self._n - 1 else " "
         middle = str(self.options[self.value])
         if w < len(middle) + 2:
             middle = middle[:w - 3] + "…"
@@ -286,6 +394,27 @@ class Menu(Widget):
         safe_addstr(window, y, x, render, color)
 
 
+_bar_palette = None
+
+
+def bar_palette():
+    """
+    Returns (selected, empty selected, empty normal) bar attributes
+    Computed lazily on first draw (color pairs need initscr) and
+    cached for every bar afterwards.
+    """
+
+    global _bar_palette
+    if _bar_palette is None:
+        _bar_palette = (
+            color_pair(3) | curses.A_BOLD,
+            color_pair(8) | curses.A_BOLD,
+            color_pair(7),
+        )
+
+    return _bar_palette
+
+
 class Bar(Widget):
     """
     Bar with a marker
@@ -293,24 +422,31 @@ class Bar(Widget):
     a circle on a number line.
     """
 
+    __slots__ = ("min", "max")
+
     def __init__(self, min, max, value=None):
         self.value = value if value is not None else min
         self.min = min
         self.max = max
 
     def draw(self, window, w, h, x, y, color):
-        filled_w = calc_width(w * (self.value - self.min),
-                              (self.max - self.min))
+        # a None value means the control could not be read; show an
+        # empty bar rather than blowing up on the arithmetic
+        value = self.min if self.value is None else self.value
+        filled_w = calc_width(w * (value - self.min), (self.max - self.min))
         empty_w = w - filled_w
 
-        safe_addstr(window, y, x, " " * filled_w, color | curses.A_REVERSE)
-        safe_addstr(window, y, x + filled_w, " " * empty_w,
-                    curses.color_pair(7))
+        # hline repeats the character inside curses, without
+        # building a width-sized Python string every frame
+        safe_hline(window, y, x, " ", filled_w, color | curses.A_REVERSE)
+        safe_hline(window, y, x + filled_w, " ", empty_w, color_pair(7))
 
 
 class BarLabeled(Bar):
     """Bar containing a label"""
 
+    __slots__ = ("label_position", )
+
     def __init__(self, min, max, value=None, label_position="left"):
         super().__init__(min, max, value)
 
@@ -318,23 +454,28 @@ class BarLabeled(Bar):
         self.label_position = label_position
 
     def draw(self, window, w, h, x, y, color):
-        text = str(self.value)
+        value = self.min if self.value is None else self.value
+
+        # an unreadable control shows a placeholder, not "None"
+        text = "?" if self.value is None else str(self.value)
         if len(text) > w:
             render = "…" + text[len(text) - w + 1:]
         else:
             render = text.center(w)
 
-        filled_w = calc_width(w * (self.value - self.min),
-                              (self.max - self.min))
+        filled_w = calc_width(w * (value - self.min), (self.max - self.min))
+
+        selected, empty_selected, empty_normal = bar_palette()
 
         # if widget is selected
-        if color == curses.color_pair(3) | curses.A_BOLD:
-            empty_color = curses.color_pair(8) | curses.A_BOLD
-        else:
-            empty_color = curses.color_pair(7)
+        empty_color = empty_selected if color == selected else empty_normal
 
-        safe_addstr(window, y, x, render[:filled_w], color | curses.A_REVERSE)
-        safe_addstr(window, y, x + filled_w, render[filled_w:], empty_color)
+        # write the label once, then flip only the attributes of the
+        # filled prefix; halves both the curses calls and the string
+        # slicing per bar
+        safe_addstr(window, y, x, render, empty_color)
+        if filled_w > 0:
+            safe_chgat(window, y, x, filled_w, color | curses.A_REVERSE)
 
 
 class Button(Widget):
@@ -343,16 +484,26 @@ class Button(Widget):
     Right now it's just a label inside of square brackets
     """
 
+    __slots__ = ("text", "_render_key", "_render")
+
     def __init__(self, text):
         self.text = text
+        self._render_key = None
+        self._render = ""
 
     def draw(self, window, w, h, x, y, color):
-        render = "[" + self.text.center(w - 2) + "]"
-        safe_addstr(window, y, x, render, color)
+        key = (self.text, w)
+        if key != self._render_key:
+            self._render = "[" + self.text.center(w - 2) + "]"
+            self._render_key = key
+
+        safe_addstr(window, y, x, self._render, color)
 
 
 class TabbedView(Widget):
 
+    __slots__ = ("widgets", "titles", "selected")
+
     def __init__(self, widgets, titles=None, selected=None):
         assert 0 < len(widgets)
         self.widgets = widgets
@@ -379,7 +530,7 @@ class TabbedView(Widget):
         tab_w = w // len(self.widgets)
 
         for i, title in enumerate(self.titles):
-            tab_color = curses.color_pair(7)
+            tab_color = color_pair(7)
             if i == self.selected:
                 tab_color |= curses.A_REVERSE
 